@@ -0,0 +1,276 @@
+"""Rush-hour load test for the queue app.
+
+Runs the app in-process against a temporary SQLite queue.db seeded with
+booking history, then drives customers and staff at the same time:
+
+    python benchmark.py --thread-users 8 --green-users 8 --visits 5
+
+--database-url runs the same load against another backend, e.g.
+postgresql+psycopg2://queue@localhost/queue_bench. It must point at an empty
+scratch database; the run creates the tables and leaves its tickets there.
+
+Thread users run in OS threads. Green users run as eventlet green threads,
+so their database work goes through run_db's native thread pool as it does
+under socketio.run. Each customer visit loads /, fetches the location
+password from /api/password, books through /create_queue, polls
+/view_my_queue and sometimes cancels. A staff worker keeps loading the
+admin panel and moving the next waiting ticket through update_status.
+
+Reports throughput, p50/p95/p99 latency and SQL statements per request for
+each endpoint.
+"""
+# Standard library imports
+import argparse
+import base64
+import contextvars
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, time as dt_time, timedelta
+
+ADMIN_AUTH = {'Authorization': 'Basic ' + base64.b64encode(b'admin:admin123').decode()}
+ADMIN_LOGIN = {'username': 'admin', 'password': 'admin123'}
+
+# Statement count of the request running in the current thread or green thread
+statement_counter = contextvars.ContextVar('statement_counter', default=None)
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = statement_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+def load_app(database_uri):
+    """Import the app against a scratch database and count its SQL"""
+    os.environ['QUEUE_DATABASE_URI'] = database_uri
+    os.environ['QUEUE_STATE_BACKEND'] = 'local'
+    os.environ.setdefault('QUEUE_LOG_LEVEL', 'WARNING')  # Keep per-ticket logs out of the report
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import app as queue_app
+    from sqlalchemy import event
+
+    with queue_app.app.app_context():
+        event.listen(queue_app.db.engine, 'before_cursor_execute', count_statement)
+    return queue_app
+
+def seed_history(queue_app, days, tickets_per_day, rng):
+    """Insert past days of completed and cancelled tickets"""
+    today = datetime.now(queue_app.LOCAL_TIMEZONE).date()
+    rows = []
+    for days_ago in range(days, 0, -1):
+        local_date = today - timedelta(days=days_ago)
+        numbers = {}
+        for _ in range(tickets_per_day):
+            # Mornings and early afternoons are busiest
+            hour = min(17, max(9, int(rng.triangular(9, 18, 11))))
+            numbers[hour] = number = numbers.get(hour, 0) + 1
+            time_slot = queue_app.combine_date_time(local_date, dt_time(hour=hour))
+            cancelled = rng.random() < 0.08
+            rows.append({
+                'name': f'History {len(rows)}',
+                'time_slot': time_slot,
+                'date': local_date,
+                'queue_code': (f"{number:02d}-{queue_app.format_hour_ampm(hour)}-"
+                               f"{queue_app.queue_code_suffix(local_date, hour, number)}"),
+                'browser_id': str(uuid.uuid4()),
+                'created_at': time_slot - timedelta(minutes=rng.randint(5, 120)),
+                'completed_at': None if cancelled else time_slot + timedelta(minutes=rng.gammavariate(2.0, 6.0)),
+                'status': 'cancelled' if cancelled else 'completed'
+            })
+
+    with queue_app.app.app_context():
+        queue_app.db.session.execute(queue_app.Queue.__table__.insert(), rows)
+        queue_app.db.session.commit()
+        # Bulk rows bypass the app's writes, so index their days the way migration 2 does
+        with queue_app.db.engine.begin() as connection:
+            queue_app.backfill_business_days(connection)
+    return len(rows)
+
+# Load generation
+class Recorder:
+    """Collects (seconds, statements, failed) samples per endpoint"""
+
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def request(self, label, call):
+        counter = [0]
+        token = statement_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = call()
+        finally:
+            elapsed = time.perf_counter() - start
+            statement_counter.reset(token)
+
+        with self.lock:
+            self.samples.setdefault(label, []).append((elapsed, counter[0], response.status_code >= 500))
+        return response
+
+def active_queue_code(queue_app, client):
+    """Queue code of the client's active ticket, looked up outside the measurements"""
+    with client.session_transaction() as browser_session:
+        browser_id = browser_session.get('browser_id')
+    if not browser_id:
+        return None
+    with queue_app.app.app_context():
+        queue = queue_app.find_active_ticket(browser_id)
+        return queue.queue_code if queue else None
+
+def customer(queue_app, recorder, rng, options, sleep):
+    client = queue_app.app.test_client()
+    calendar = queue_app.get_calendar(datetime.now(queue_app.LOCAL_TIMEZONE).date())
+    for _ in range(options.visits):
+        recorder.request('GET /', lambda: client.get('/'))
+        response = recorder.request('GET /api/password',
+                                    lambda: client.get('/api/password', headers=ADMIN_AUTH))
+        password = response.get_json()['password']
+
+        form = {
+            'name': f'Customer {rng.randint(1, 10 ** 6)}',
+            'time_slot': rng.choice(calendar.slots).label,
+            'location_password': password
+        }
+        recorder.request('POST /create_queue', lambda: client.post('/create_queue', data=form))
+
+        for _ in range(options.polls):
+            sleep(options.think)
+            recorder.request('GET /view_my_queue', lambda: client.get('/view_my_queue'))
+
+        queue_code = active_queue_code(queue_app, client)
+        if queue_code and rng.random() < options.cancel_rate:
+            recorder.request('GET /cancel_queue', lambda: client.get(f'/cancel_queue/{queue_code}'))
+        sleep(options.think)
+
+def staff(queue_app, recorder, stop, options):
+    """Serve the next waiting ticket until the customers are done"""
+    client = queue_app.app.test_client()
+    client.post('/admin/login', data=ADMIN_LOGIN)
+    today = datetime.now(queue_app.LOCAL_TIMEZONE).date()
+
+    while not stop.is_set():
+        recorder.request('GET /admin/', lambda: client.get('/admin/'))
+        waiting = queue_app.get_waiting_list(today)
+        if not waiting:
+            time.sleep(options.think or 0.01)
+            continue
+
+        queue_code = waiting[0][2]
+        for status in ('in_progress', 'completed'):
+            recorder.request('POST /admin/update_status', lambda: client.post(
+                f'/admin/update_status/{queue_code}', data={'status': status}))
+        time.sleep(options.think)
+
+def run_load(queue_app, options):
+    """Drive thread and green customers plus staff; returns (recorder, wall seconds)"""
+    import eventlet
+
+    recorder = Recorder()
+    stop = threading.Event()
+    rng = random.Random(options.seed)
+    seeds = [rng.random() for _ in range(options.thread_users + options.green_users)]
+
+    start = time.perf_counter()
+    staff_threads = [threading.Thread(target=staff, args=(queue_app, recorder, stop, options))
+                     for _ in range(options.staff)]
+    customer_threads = [
+        threading.Thread(target=customer, args=(
+            queue_app, recorder, random.Random(seeds[i]), options, time.sleep))
+        for i in range(options.thread_users)
+    ]
+    for thread in staff_threads + customer_threads:
+        thread.start()
+
+    pool = eventlet.GreenPool()
+    for i in range(options.green_users):
+        pool.spawn(customer, queue_app, recorder,
+                   random.Random(seeds[options.thread_users + i]), options, eventlet.sleep)
+    pool.waitall()
+
+    for thread in customer_threads:
+        thread.join()
+    stop.set()
+    for thread in staff_threads:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+# Reporting
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(samples, wall_seconds):
+    latencies = sorted(elapsed for elapsed, _, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, failed in samples if failed),
+        'throughput': len(samples) / wall_seconds,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'sql_per_request': sum(statements for _, statements, _ in samples) / len(samples)
+    }
+
+def report(recorder, wall_seconds):
+    results = {label: summarize(samples, wall_seconds)
+               for label, samples in sorted(recorder.samples.items())}
+    results['total'] = summarize(
+        [sample for samples in recorder.samples.values() for sample in samples], wall_seconds)
+
+    print(f"{'endpoint':<28}{'requests':>9}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'SQL/req':>9}")
+    for label, result in results.items():
+        print(f"{label:<28}{result['requests']:>9}{result['errors']:>8}{result['throughput']:>9.1f}"
+              f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+              f"{result['sql_per_request']:>9.2f}")
+    print(f"wall time: {wall_seconds:.2f}s")
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--thread-users', type=int, default=8, help='customers in OS threads')
+    parser.add_argument('--green-users', type=int, default=8, help='customers in eventlet green threads')
+    parser.add_argument('--staff', type=int, default=1, help='admin workers advancing tickets')
+    parser.add_argument('--visits', type=int, default=5, help='bookings per customer')
+    parser.add_argument('--polls', type=int, default=3, help='/view_my_queue polls per booking')
+    parser.add_argument('--cancel-rate', type=float, default=0.1)
+    parser.add_argument('--think', type=float, default=0.0, help='seconds between a user\'s requests')
+    parser.add_argument('--history-days', type=int, default=30)
+    parser.add_argument('--tickets-per-day', type=int, default=120)
+    parser.add_argument('--slot-capacity', type=int, help='override MAX_SLOTS_PER_HOUR')
+    parser.add_argument('--database-url', help='empty scratch database (default: temporary SQLite)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    options = parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        queue_app = load_app(options.database_url or f"sqlite:///{os.path.join(directory, 'queue.db')}")
+        if options.slot_capacity:
+            queue_app.MAX_SLOTS_PER_HOUR = options.slot_capacity
+
+        seeded = seed_history(queue_app, options.history_days, options.tickets_per_day,
+                              random.Random(options.seed))
+        print(f"Seeded {seeded} historical tickets over {options.history_days} days")
+
+        recorder, wall_seconds = run_load(queue_app, options)
+        results = report(recorder, wall_seconds)
+
+        with queue_app.app.app_context():
+            queue_app.db.engine.dispose()
+
+    if options.json:
+        with open(options.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
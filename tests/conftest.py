@@ -0,0 +1,145 @@
+"""Fixtures that load the app against each database backend.
+
+    python -m pytest tests
+
+Every test runs once per backend. SQLite uses a temporary file. PostgreSQL
+runs when QUEUE_TEST_POSTGRES_URL (default below) names a reachable scratch
+database and is skipped otherwise; its tables are dropped and recreated.
+"""
+# Standard library imports
+import importlib
+import itertools
+import os
+import sys
+import uuid
+from datetime import date, timedelta
+
+# Third-party imports
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+POSTGRES_URL = os.environ.get('QUEUE_TEST_POSTGRES_URL',
+                              'postgresql+psycopg2://postgres@localhost/queue_test')
+TEST_ENVIRONMENT = {
+    'QUEUE_STATE_BACKEND': 'local',
+    'QUEUE_DAY_START': '09:00',
+    'QUEUE_DAY_END': '18:00',
+    'QUEUE_SLOT_MINUTES': '60',
+    'QUEUE_ARCHIVE_AFTER_DAYS': '0',  # Tests archive explicitly
+    'QUEUE_LOG_LEVEL': 'WARNING'
+}
+
+# Each test books in a week of its own, so tests never share slots or counters
+future_dates = itertools.count()
+past_dates = itertools.count()
+
+def database_url(backend, tmp_path_factory):
+    if backend == 'sqlite':
+        return f"sqlite:///{tmp_path_factory.mktemp('db') / 'queue.db'}"
+
+    import sqlalchemy
+    try:
+        engine = sqlalchemy.create_engine(POSTGRES_URL)
+        with engine.connect():
+            pass
+        engine.dispose()
+    except Exception as e:
+        pytest.skip(f'PostgreSQL unavailable at {POSTGRES_URL}: {e}')
+    return POSTGRES_URL
+
+@pytest.fixture(scope='session', params=['sqlite', 'postgresql'])
+def queue_app(request, tmp_path_factory):
+    """The app module imported against one backend"""
+    environment = dict(TEST_ENVIRONMENT, QUEUE_DATABASE_URI=database_url(request.param, tmp_path_factory))
+    saved = {name: os.environ.get(name) for name in environment}
+    os.environ.update(environment)
+
+    # The app reads its configuration at import, so each backend gets a fresh import
+    sys.modules.pop('app', None)
+    module = importlib.import_module('app')
+    with module.app.app_context():
+        if request.param != 'sqlite':
+            module.db.drop_all()
+            module.initialize_database()
+            module.rebuild_waiting_index()
+    yield module
+
+    with module.app.app_context():
+        module.db.engine.dispose()
+    sys.modules.pop('app', None)
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+@pytest.fixture
+def q(queue_app):
+    """The app module with an app context pushed for the test"""
+    with queue_app.app.app_context():
+        yield queue_app
+        queue_app.db.session.remove()
+
+@pytest.fixture
+def local_date():
+    """An upcoming local date no other test books on"""
+    return date(2031, 1, 6) + timedelta(weeks=next(future_dates))
+
+@pytest.fixture
+def past_date():
+    """A past local date no other test books on, old enough to archive"""
+    return date(2020, 1, 6) + timedelta(weeks=next(past_dates))
+
+@pytest.fixture
+def book(q):
+    """book(local_date, slot_index=0) -> committed and recorded TicketChange, or None if full"""
+    def book(local_date, slot_index=0, name='Customer'):
+        slot = q.get_calendar(local_date).slots[slot_index]
+        change = q.book_ticket(name, str(uuid.uuid4()), local_date, slot)
+        if change:
+            q.record_ticket_change(change)
+        return change
+    return book
+
+@pytest.fixture
+def set_status(q):
+    """set_status(queue_code, status) -> committed and recorded TicketChange"""
+    def set_status(queue_code, status):
+        change = q.set_ticket_status(queue_code, status)
+        if change:
+            q.record_ticket_change(change)
+        return change
+    return set_status
+
+@pytest.fixture
+def assert_consistent(q):
+    """Check every derived count of a local date against its ticket rows"""
+    def assert_consistent(local_date):
+        tickets = [ticket for model in q.TICKET_MODELS
+                   for ticket in model.query.filter(model.date == local_date).all()]
+        live = q.Queue.query.filter(q.Queue.date == local_date).all()
+        calendar = q.get_calendar(local_date)
+
+        # Occupancy counters match a fresh count
+        counters = {label: count for label, count in q.get_slot_occupancy(local_date).items() if count}
+        assert counters == q.load_slot_occupancy(local_date)
+
+        # Reservations hold exactly the active tickets of their slot
+        for slot in calendar.slots:
+            reservation = q.db.session.get(q.SlotReservation, slot.start)
+            active = sum(1 for ticket in live if ticket.status in q.ACTIVE_STATUSES and
+                         calendar.slot_at(ticket.time_slot) == slot)
+            assert (reservation.reserved if reservation else 0) == active, slot.label
+
+        # The business day index matches the rows in both tables
+        day = q.db.session.get(q.BusinessDay, local_date)
+        assert day.tickets == len(tickets)
+        for status in q.TICKET_STATUSES:
+            assert getattr(day, status) == sum(1 for ticket in tickets if ticket.status == status), status
+
+        # The waiting index lists the waiting tickets in service order
+        waiting = sorted(q.waiting_key(ticket.time_slot, ticket.queue_code)
+                         for ticket in live if ticket.status == 'waiting')
+        assert [key[2] for key in q.get_waiting_list(local_date)] == [key[2] for key in waiting]
+    return assert_consistent
@@ -0,0 +1,74 @@
+"""Archiving finished tickets and paging through a day's tickets"""
+# Standard library imports
+from datetime import timedelta
+
+def test_archive_moves_only_finished_tickets(q, book, set_status, past_date, assert_consistent):
+    codes = [book(past_date, index % 2).queue_code for index in range(5)]
+    set_status(codes[0], 'completed')
+    set_status(codes[1], 'completed')
+    set_status(codes[2], 'cancelled')
+    later = book(past_date + timedelta(days=1)).queue_code
+    set_status(later, 'completed')
+
+    assert q.archive_batch(past_date) == 3
+
+    live = {ticket.queue_code for ticket in q.Queue.query.filter_by(date=past_date)}
+    archived = {ticket.queue_code for ticket in q.QueueArchive.query.filter_by(date=past_date)}
+    assert live == set(codes[3:])
+    assert archived == set(codes[:3])
+    assert q.Queue.query.filter_by(queue_code=later).count() == 1
+    assert_consistent(past_date)
+
+    # Archived tickets are read-only
+    assert q.set_ticket_status(codes[0], 'waiting') is None
+    assert q.archive_batch(past_date) == 0
+
+def test_archived_tickets_keep_their_history(q, book, set_status, past_date):
+    codes = [book(past_date).queue_code for _ in range(3)]
+    for code in codes:
+        set_status(code, 'completed')
+    stats = q.get_day_stats(past_date)
+    with q.wait_stats_lock:
+        before = (stats['completed'], stats['wait_count'], stats['wait_minutes'])
+    assert before[0] == 3
+
+    q.archive_batch(past_date)
+    q.wait_stats.pop(past_date, None)
+    stats = q.get_day_stats(past_date)
+    with q.wait_stats_lock:
+        assert (stats['completed'], stats['wait_count'], stats['wait_minutes']) == before
+
+def test_pages_cover_live_and_archived_tickets_once(q, book, set_status, past_date):
+    codes = [book(past_date, index % 3).queue_code for index in range(25)]
+    for code in codes[::4]:
+        set_status(code, 'completed')
+    q.archive_batch(past_date)
+
+    seen, after, pages = [], None, 0
+    while True:
+        queues, after = q.load_day_tickets(past_date, after=after, limit=4)
+        seen += queues
+        pages += 1
+        if after is None:
+            break
+
+    assert pages == 7
+    assert sorted(queue.queue_code for queue in seen) == sorted(codes)
+    keys = [(q.ensure_timezone(queue.time_slot), queue.queue_code) for queue in seen]
+    assert keys == sorted(keys)
+
+    waiting, after = q.load_day_tickets(past_date, status='waiting', limit=100)
+    assert after is None
+    assert len(waiting) == 25 - len(codes[::4])
+
+def test_admin_day_lists_every_ticket_unless_filtered(q, book, local_date, monkeypatch):
+    monkeypatch.setattr(q, 'ADMIN_PAGE_SIZE', 2)
+    codes = [book(local_date, index % 3).queue_code for index in range(5)]
+
+    queues, next_after, day_counts, dates = q.load_admin_day(local_date)
+    assert next_after is None
+    assert sorted(queue.queue_code for queue in queues) == sorted(codes)
+    assert day_counts.waiting == 5 and local_date in dates
+
+    queues, next_after, _, _ = q.load_admin_day(local_date, 'waiting')
+    assert len(queues) == 2 and next_after == q.page_cursor(queues[-1])
@@ -0,0 +1,103 @@
+"""Slot capacity and queue code allocation"""
+# Standard library imports
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+def test_slot_admits_up_to_capacity(q, book, set_status, local_date, assert_consistent, monkeypatch):
+    monkeypatch.setattr(q, 'MAX_SLOTS_PER_HOUR', 3)
+    changes = [book(local_date) for _ in range(5)]
+    assert [change is not None for change in changes] == [True, True, True, False, False]
+    assert q.get_slot_occupancy(local_date) == {'09:00': 3}
+
+    # A cancellation frees its place for the next booking
+    set_status(changes[0].queue_code, 'cancelled')
+    assert book(local_date) is not None
+    assert book(local_date) is None
+    assert_consistent(local_date)
+
+def test_concurrent_bookings_never_overbook(queue_app, local_date, monkeypatch):
+    q = queue_app
+    monkeypatch.setattr(q, 'MAX_SLOTS_PER_HOUR', 4)
+    slot = q.get_calendar(local_date).slots[1]
+    start = threading.Barrier(12)
+    results = []
+
+    def customer():
+        with q.app.app_context():
+            start.wait()
+            results.append(q.book_ticket('Customer', str(uuid.uuid4()), local_date, slot))
+            q.db.session.remove()
+
+    threads = [threading.Thread(target=customer) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    booked = [change for change in results if change]
+    assert len(results) == 12
+    assert len(booked) == 4
+    assert len({change.queue_code for change in booked}) == 4
+    with q.app.app_context():
+        assert q.db.session.get(q.SlotReservation, slot.start).reserved == 4
+        assert q.Queue.query.filter_by(date=local_date).count() == 4
+        q.db.session.remove()
+
+def test_codes_count_up_per_hour(q, book, local_date):
+    codes = [book(local_date, 0).queue_code for _ in range(3)] + \
+            [book(local_date, 1).queue_code for _ in range(2)]
+
+    assert [code.rsplit('-', 1)[0] for code in codes] == ['01-9A', '02-9A', '03-9A', '01-10A', '02-10A']
+    for code in codes:
+        number, hour_code, suffix = code.split('-')
+        hour = 9 if hour_code == '9A' else 10
+        assert suffix == q.queue_code_suffix(local_date, hour, int(number))
+
+def test_codes_continue_after_existing_tickets(q, book, local_date):
+    slot = q.get_calendar(local_date).slots[0]
+    q.db.session.add(q.Queue(name='Legacy', time_slot=slot.start, date=local_date,
+                             queue_code='07-9A-ZZZ', browser_id=str(uuid.uuid4())))
+    q.db.session.commit()
+
+    assert book(local_date).queue_code.startswith('08-9A-')
+
+def test_code_suffixes_do_not_repeat_across_days(q, local_date):
+    suffixes = {q.queue_code_suffix(local_date + timedelta(days=day), 9, 1)
+                for day in range(q.SUFFIX_SPACE)}
+    assert len(suffixes) == q.SUFFIX_SPACE
+
+def test_create_queue_books_listed_slots_only(q):
+    client = q.app.test_client()
+    client.get('/')
+    password = q.get_location_password()['value']
+    slot = q.get_calendar(datetime.now(q.LOCAL_TIMEZONE).date()).slots[-1]
+
+    response = client.post('/create_queue', data={
+        'name': 'Walk-in', 'time_slot': '09:15', 'location_password': password})
+    assert response.status_code == 302 and response.location.endswith('/')
+
+    response = client.post('/create_queue', data={
+        'name': 'Walk-in', 'time_slot': slot.label, 'location_password': password})
+    assert response.status_code == 302 and response.location.endswith('/view_my_queue')
+    with client.session_transaction() as browser_session:
+        ticket = q.find_active_ticket(browser_session['browser_id'])
+    assert q.ensure_timezone(ticket.time_slot) == slot.start
+
+def test_stale_full_count_does_not_turn_customers_away(q, book, set_status, monkeypatch):
+    monkeypatch.setattr(q, 'MAX_SLOTS_PER_HOUR', 2)
+    today = datetime.now(q.LOCAL_TIMEZONE).date()
+    slot = q.get_calendar(today).slots[-2]
+    codes = [book(today, -2).queue_code for _ in range(2)]
+    set_status(codes[0], 'cancelled')
+
+    # A lost decrement leaves the counters claiming the slot is still full
+    q.state.incr(q.occupancy_group(today), slot.label, 1)
+    assert q.get_slot_occupancy(today)[slot.label] == 2
+
+    client = q.app.test_client()
+    response = client.post('/create_queue', data={
+        'name': 'Walk-in', 'time_slot': slot.label,
+        'location_password': q.get_location_password()['value']})
+    assert response.status_code == 302 and response.location.endswith('/view_my_queue')
+    assert q.get_slot_occupancy(today) == q.load_slot_occupancy(today)
@@ -0,0 +1,82 @@
+"""Status changes and admin bulk actions keep every derived count in step"""
+
+def test_status_changes_keep_counts_consistent(q, book, set_status, local_date, assert_consistent):
+    codes = [book(local_date, index % 2).queue_code for index in range(6)]
+    assert_consistent(local_date)
+
+    for code, status in [(codes[0], 'in_progress'), (codes[0], 'completed'),
+                         (codes[1], 'cancelled'), (codes[1], 'waiting'),
+                         (codes[2], 'in_progress'), (codes[2], 'waiting'),
+                         (codes[3], 'cancelled')]:
+        change = set_status(code, status)
+        assert (change.queue_code, change.new_status) == (code, status)
+        assert_consistent(local_date)
+
+    completed = q.Queue.query.filter_by(queue_code=codes[0]).one()
+    assert completed.completed_at is not None
+
+def test_repeating_a_status_changes_nothing(q, book, set_status, local_date, assert_consistent):
+    code = book(local_date).queue_code
+    set_status(code, 'cancelled')
+    set_status(code, 'cancelled')
+    assert_consistent(local_date)
+    assert q.db.session.get(q.BusinessDay, local_date).cancelled == 1
+
+def test_unknown_ticket_is_not_changed(q):
+    assert q.set_ticket_status('99-9A-ZZZ', 'completed') is None
+
+def test_bulk_actions_keep_counts_consistent(q, book, local_date, assert_consistent):
+    for index in range(9):
+        book(local_date, index % 3)
+    service_order = [code for _, _, code in q.get_waiting_list(local_date)]
+
+    changes = q.bulk_transition('advance', local_date, count=3)
+    q.record_ticket_changes(changes)
+    assert [change.queue_code for change in changes] == service_order[:3]
+    assert {change.new_status for change in changes} == {'in_progress'}
+    assert_consistent(local_date)
+
+    changes = q.bulk_transition('complete', local_date)
+    q.record_ticket_changes(changes)
+    assert sorted(change.queue_code for change in changes) == sorted(service_order[:3])
+    assert_consistent(local_date)
+
+    changes = q.bulk_transition('set', local_date, queue_codes=service_order[3:6], new_status='cancelled')
+    q.record_ticket_changes(changes)
+    assert len(changes) == 3
+    assert_consistent(local_date)
+
+    # Reopening cancelled tickets takes their places back
+    changes = q.bulk_transition('set', local_date, queue_codes=service_order[3:5], new_status='waiting')
+    q.record_ticket_changes(changes)
+    assert_consistent(local_date)
+
+    day = q.db.session.get(q.BusinessDay, local_date)
+    assert (day.tickets, day.waiting, day.completed, day.cancelled) == (9, 5, 3, 1)
+
+def test_bulk_advance_skips_tickets_already_served(q, book, set_status, local_date, assert_consistent):
+    codes = [book(local_date).queue_code for _ in range(3)]
+    set_status(codes[0], 'completed')
+
+    changes = q.bulk_transition('advance', local_date, count=5)
+    q.record_ticket_changes(changes)
+    assert [change.queue_code for change in changes] == codes[1:]
+    assert_consistent(local_date)
+
+def test_replayed_changes_do_not_duplicate_waiting_tickets(q, book, local_date, assert_consistent):
+    # Another worker's events can arrive for tickets the waiting index already loaded
+    changes = [book(local_date) for _ in range(3)]
+    q.record_ticket_changes(changes[1:], remote=True)
+    assert [code for _, _, code in q.get_waiting_list(local_date)] == \
+        [change.queue_code for change in changes]
+    assert_consistent(local_date)
+
+def test_bulk_status_rejects_malformed_bodies(q):
+    client = q.app.test_client()
+    with client.session_transaction() as browser_session:
+        browser_session['admin_logged_in'] = True
+
+    for body in ([1, 2], 'set', {'action': 'set', 'status': 'cancelled', 'codes': [{'a': 1}]},
+                 {'action': 'set', 'status': 'cancelled', 'codes': '01-9A-AAA'},
+                 {'action': 'advance', 'date': 20310106}):
+        assert client.post('/admin/bulk_status', json=body).status_code == 400, body